@@ -10,10 +10,10 @@ mod shape;
 use std::{borrow::Borrow, fmt::Debug, str::FromStr, sync::Arc};
 
 use hashbrown::HashMap;
-use ndarray::ArrayViewMut2;
+use ndarray::{Array1, Array2, ArrayViewMut2};
 use numpy::{prelude::*, AllowTypeChange, PyArray1, PyArray2, PyArrayLike1, PyArrayLike2};
 use pyo3::{
-    exceptions::{PyRuntimeError, PyTypeError, PyValueError},
+    exceptions::{PyRuntimeError, PyValueError},
     prelude::*,
     types::{DerefToPyAny, PyDict},
 };
@@ -55,12 +55,17 @@ use crate::{
 ///         sequence should be 2 if the channel is complex, or 1 if the channel is
 ///         real. Defaults to ``None``.
 ///     iir (array_like[N, 6] | None): IIR filter of the channel. The format of
-///         the array is ``[[b0, b1, b2, a0, a1, a2], ...]``, which is the same
-///         as `sos` parameter of :func:`scipy.signal.sosfilt`. Defaults to ``None``.
+///         the array is ``[[b0, b1, b2, a0, a1, a2], ...]``, the same layout as
+///         `sos` parameter of :func:`scipy.signal.sosfilt`. Unlike scipy, ``a0``
+///         needn't be 1; each section is normalized by its ``a0``. Defaults to
+///         ``None``.
 ///     fir (array_like[M] | None): FIR filter of the channel. Defaults to None.
 ///     filter_offset (bool): Whether to apply filter to the offset. Defaults to
 ///         ``False``.
 ///     is_real (bool): Whether the channel is real. Defaults to ``False``.
+/// Raises:
+///     ValueError: If an array has an invalid shape or a section of `iir` has
+///         ``a0 == 0``.
 #[pyclass(get_all, frozen)]
 #[derive(Debug, Clone)]
 struct Channel {
@@ -140,6 +145,11 @@ impl Channel {
             if !matches!(iir.shape(), [_, 6]) {
                 return Err(PyValueError::new_err("iir should be a Nx6 matrix"));
             }
+            if iir.as_array().column(3).iter().any(|&a0| a0 == 0.0) {
+                return Err(PyValueError::new_err(
+                    "iir a0 coefficients should be non-zero",
+                ));
+            }
             let kwargs = PyDict::new_bound(py);
             kwargs.set_item("write", false)?;
             iir.getattr("setflags")?.call((), Some(&kwargs))?;
@@ -212,28 +222,32 @@ impl Alignment {
         if let Ok(slf) = obj.extract() {
             return Ok(slf);
         }
-        if let Ok(s) = obj.extract() {
-            let alignment = match s {
-                "end" => Some(Alignment::End),
-                "start" => Some(Alignment::Start),
-                "center" => Some(Alignment::Center),
-                "stretch" => Some(Alignment::Stretch),
-                _ => None,
-            };
-            if let Some(alignment) = alignment {
-                return Py::new(obj.py(), alignment);
-            }
-        }
-        let msg = concat!(
-            "Failed to convert the value to Alignment. ",
-            "Must be Alignment or one of 'end', 'start', 'center', 'stretch'"
-        );
-        Err(PyValueError::new_err(msg))
+        Py::new(obj.py(), extract_alignment(obj)?)
     }
 }
 
+/// Extract the alignment without creating a Python object for string input.
 fn extract_alignment(obj: &Bound<PyAny>) -> PyResult<Alignment> {
-    Alignment::convert(obj).and_then(|x| x.extract(obj.py()))
+    if let Ok(alignment) = obj.extract() {
+        return Ok(alignment);
+    }
+    if let Ok(s) = obj.extract() {
+        let alignment = match s {
+            "end" => Some(Alignment::End),
+            "start" => Some(Alignment::Start),
+            "center" => Some(Alignment::Center),
+            "stretch" => Some(Alignment::Stretch),
+            _ => None,
+        };
+        if let Some(alignment) = alignment {
+            return Ok(alignment);
+        }
+    }
+    let msg = concat!(
+        "Failed to convert the value to Alignment. ",
+        "Must be Alignment or one of 'end', 'start', 'center', 'stretch'"
+    );
+    Err(PyValueError::new_err(msg))
 }
 
 /// Base class for shapes.
@@ -249,22 +263,13 @@ fn extract_alignment(obj: &Bound<PyAny>) -> PyResult<Alignment> {
 /// - :class:`Interp`: Interpolated shape.
 #[pyclass(subclass, frozen)]
 #[derive(Debug, Clone)]
-struct Shape;
+struct Shape(shape::Shape);
 
 impl Shape {
-    fn get_rust_shape(slf: &Bound<Shape>) -> PyResult<shape::Shape> {
-        if slf.downcast::<Hann>().is_ok() {
-            return Ok(shape::Shape::new_hann());
-        }
-        if let Ok(interp) = slf.downcast::<Interp>() {
-            let interp = interp.get();
-            return Ok(shape::Shape::new_interp(
-                interp.knots.clone(),
-                interp.controls.clone(),
-                interp.degree,
-            )?);
-        }
-        Err(PyTypeError::new_err("Invalid shape type."))
+    /// The interned Rust shape is resolved once at construction, so using the
+    /// same shape object in many calls doesn't hash its parameters again.
+    fn get_rust_shape(&self) -> shape::Shape {
+        self.0.clone()
     }
 }
 
@@ -277,7 +282,7 @@ struct Hann;
 impl Hann {
     #[new]
     fn new() -> (Self, Shape) {
-        (Self, Shape)
+        (Self, Shape(shape::Shape::new_hann()))
     }
 }
 
@@ -286,15 +291,22 @@ impl Hann {
 /// The interpolated shape use a B-spline. :func:`scipy.interpolate.make_interp_spline`
 /// can be used to calculate the parameters.
 ///
+/// The B-spline is built when the shape is constructed, so the same instance can
+/// be reused across :func:`generate_waveforms` calls.
+///
 /// .. caution::
 ///
-///     It's user's responsibility to ensure the b-spline parameters are valid and
-///     the shape is normalized such that :math:`f(\pm 0.5) = 0` and :math:`f(0) = 1`.
+///     Only NaN values are checked. It's user's responsibility to ensure the
+///     number of knots matches the number of controls and the degree, otherwise
+///     the construction panics. The shape should also be normalized such that
+///     :math:`f(\pm 0.5) = 0` and :math:`f(0) = 1`.
 ///
 /// Args:
 ///     knots (Sequence[float]): Knots of the B-spline.
 ///     controls (Sequence[float]): Control points of the B-spline.
 ///     degree (int): Degree of the B-spline.
+/// Raises:
+///     RuntimeError: If `knots` or `controls` contains NaN.
 /// Example:
 ///     .. code-block:: python
 ///
@@ -318,13 +330,14 @@ struct Interp {
 impl Interp {
     #[new]
     fn new(knots: Vec<f64>, controls: Vec<f64>, degree: usize) -> PyResult<(Self, Shape)> {
+        let shape = shape::Shape::new_interp(knots.clone(), controls.clone(), degree)?;
         Ok((
             Self {
                 knots,
                 controls,
                 degree,
             },
-            Shape,
+            Shape(shape),
         ))
     }
 }
@@ -1183,26 +1196,30 @@ impl Direction {
         if let Ok(slf) = obj.extract() {
             return Ok(slf);
         }
-        if let Ok(s) = obj.extract() {
-            let direction = match s {
-                "backward" => Some(Direction::Backward),
-                "forward" => Some(Direction::Forward),
-                _ => None,
-            };
-            if let Some(direction) = direction {
-                return Py::new(obj.py(), direction);
-            }
-        }
-        let msg = concat!(
-            "Failed to convert the value to Direction. ",
-            "Must be Direction or one of 'backward', 'forward'"
-        );
-        Err(PyValueError::new_err(msg))
+        Py::new(obj.py(), extract_direction(obj)?)
     }
 }
 
+/// Extract the direction without creating a Python object for string input.
 fn extract_direction(obj: &Bound<PyAny>) -> PyResult<Direction> {
-    Direction::convert(obj).and_then(|x| x.extract(obj.py()))
+    if let Ok(direction) = obj.extract() {
+        return Ok(direction);
+    }
+    if let Ok(s) = obj.extract() {
+        let direction = match s {
+            "backward" => Some(Direction::Backward),
+            "forward" => Some(Direction::Forward),
+            _ => None,
+        };
+        if let Some(direction) = direction {
+            return Ok(direction);
+        }
+    }
+    let msg = concat!(
+        "Failed to convert the value to Direction. ",
+        "Must be Direction or one of 'backward', 'forward'"
+    );
+    Err(PyValueError::new_err(msg))
 }
 
 /// A stack layout element.
@@ -1591,19 +1608,10 @@ impl GridLength {
     ///     ValueError: If the value cannot be converted.
     #[staticmethod]
     fn convert(obj: &Bound<PyAny>) -> PyResult<Py<Self>> {
-        let py = obj.py();
         if let Ok(slf) = obj.extract() {
             return Ok(slf);
         }
-        if let Ok(v) = obj.extract() {
-            return Py::new(py, GridLength::fixed(v)?);
-        }
-        if let Ok(s) = obj.extract() {
-            return Py::new(py, GridLength::from_str(s)?);
-        }
-        Err(PyValueError::new_err(
-            "Failed to convert the value to GridLength.",
-        ))
+        Py::new(obj.py(), extract_grid_length(obj)?)
     }
 }
 
@@ -1641,8 +1649,21 @@ impl FromStr for GridLength {
     }
 }
 
+/// Extract the grid length without creating a Python object for float or
+/// string input.
 fn extract_grid_length(obj: &Bound<PyAny>) -> PyResult<GridLength> {
-    GridLength::convert(obj).and_then(|x| x.extract(obj.py()))
+    if let Ok(length) = obj.extract() {
+        return Ok(length);
+    }
+    if let Ok(v) = obj.extract() {
+        return GridLength::fixed(v);
+    }
+    if let Ok(s) = obj.extract() {
+        return GridLength::from_str(s).map_err(|e| PyValueError::new_err(e.to_string()));
+    }
+    Err(PyValueError::new_err(
+        "Failed to convert the value to GridLength.",
+    ))
 }
 
 /// A child element in a grid layout.
@@ -1962,21 +1983,8 @@ fn generate_waveforms(
         allow_oversize,
     )?;
     let waveforms = sample_waveform(py, &channels, pulse_lists, crosstalk, time_tolerance)?;
-    Ok(py.allow_threads(|| {
-        waveforms
-            .into_par_iter()
-            .map(|(n, w)| {
-                Python::with_gil(|py| {
-                    let w = w.bind(py);
-                    let mut w = w.readwrite();
-                    let mut w = w.as_array_mut();
-                    let c = &channels[&n];
-                    post_process(py, &mut w, c);
-                });
-                (n, w)
-            })
-            .collect()
-    }))
+    post_process(py, &waveforms, &channels);
+    Ok(waveforms)
 }
 
 fn build_pulse_lists(
@@ -1993,8 +2001,7 @@ fn build_pulse_lists(
         executor.add_channel(n.clone(), c.base_freq);
     }
     for (n, s) in shapes {
-        let s = s.bind(py);
-        executor.add_shape(n.clone(), Shape::get_rust_shape(s)?);
+        executor.add_shape(n.clone(), s.get().get_rust_shape());
     }
     let schedule = &schedule.get().0;
     py.allow_threads(|| {
@@ -2035,42 +2042,78 @@ fn sample_waveform(
     Ok(waveforms)
 }
 
-fn post_process(py: Python, w: &mut ArrayViewMut2<f64>, c: &Channel) {
-    macro_rules! map_as_array {
-        ($n:ident) => {
-            let temp = c.$n.as_ref().map(|x| x.bind(py).readonly());
-            let $n = temp.as_ref().map(|x| x.as_array());
-        };
+/// Post-processing parameters of a channel.
+///
+/// The arrays are small, so they are copied out of the Python objects once and
+/// all waveforms can then be processed in parallel without the GIL.
+#[derive(Debug)]
+struct PostProcess {
+    iq_matrix: Option<Array2<f64>>,
+    offset: Option<Array1<f64>>,
+    iir: Option<Array2<f64>>,
+    fir: Option<Array1<f64>>,
+    filter_offset: bool,
+}
+
+impl PostProcess {
+    fn new(py: Python, c: &Channel) -> Self {
+        macro_rules! to_owned_array {
+            ($n:ident) => {
+                c.$n.as_ref().map(|x| x.bind(py).to_owned_array())
+            };
+        }
+        Self {
+            iq_matrix: to_owned_array!(iq_matrix),
+            offset: to_owned_array!(offset),
+            iir: to_owned_array!(iir),
+            fir: to_owned_array!(fir),
+            filter_offset: c.filter_offset,
+        }
     }
-    map_as_array!(iq_matrix);
-    map_as_array!(offset);
-    map_as_array!(iir);
-    map_as_array!(fir);
-    py.allow_threads(|| {
-        if let Some(iq_matrix) = iq_matrix {
-            apply_iq_inplace(w, iq_matrix);
+
+    fn apply(&self, w: &mut ArrayViewMut2<f64>) {
+        if let Some(iq_matrix) = &self.iq_matrix {
+            apply_iq_inplace(w, iq_matrix.view());
         }
-        if c.filter_offset {
-            if let Some(offset) = offset {
-                apply_offset_inplace(w, offset);
+        if self.filter_offset {
+            if let Some(offset) = &self.offset {
+                apply_offset_inplace(w, offset.view());
             }
-            if let Some(iir) = iir {
-                apply_iir_inplace(w, iir);
+            if let Some(iir) = &self.iir {
+                apply_iir_inplace(w, iir.view());
             }
-            if let Some(fir) = fir {
-                apply_fir_inplace(w, fir);
+            if let Some(fir) = &self.fir {
+                apply_fir_inplace(w, fir.view());
             }
         } else {
-            if let Some(iir) = iir {
-                apply_iir_inplace(w, iir);
+            if let Some(iir) = &self.iir {
+                apply_iir_inplace(w, iir.view());
             }
-            if let Some(fir) = fir {
-                apply_fir_inplace(w, fir);
+            if let Some(fir) = &self.fir {
+                apply_fir_inplace(w, fir.view());
             }
-            if let Some(offset) = offset {
-                apply_offset_inplace(w, offset);
+            if let Some(offset) = &self.offset {
+                apply_offset_inplace(w, offset.view());
             }
         }
+    }
+}
+
+fn post_process(
+    py: Python,
+    waveforms: &HashMap<ChannelId, Py<PyArray2<f64>>>,
+    channels: &HashMap<ChannelId, Channel>,
+) {
+    let mut borrowed: Vec<_> = waveforms
+        .iter()
+        .map(|(n, w)| (w.bind(py).readwrite(), PostProcess::new(py, &channels[n])))
+        .collect();
+    let jobs: Vec<_> = borrowed
+        .iter_mut()
+        .map(|(w, p)| (w.as_array_mut(), &*p))
+        .collect();
+    py.allow_threads(|| {
+        jobs.into_par_iter().for_each(|(mut w, p)| p.apply(&mut w));
     });
 }
 
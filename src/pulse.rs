@@ -2,6 +2,7 @@ mod fir;
 mod iir;
 
 use std::{
+    iter,
     ops::{Add, Mul},
     sync::Arc,
 };
@@ -278,7 +279,7 @@ impl PulseListBuilder {
 }
 
 fn mix_add_envelope(
-    mut waveform: ArrayViewMut2<f64>,
+    waveform: ArrayViewMut2<f64>,
     envelope: &[f64],
     amplitude: Complex64,
     drag_amp: Complex64,
@@ -296,30 +297,49 @@ fn mix_add_envelope(
         };
         (right - left) / 2.0
     });
-    for (mut y, env, slope) in izip!(waveform.columns_mut(), envelope.iter().copied(), slope_iter) {
+    let samples = izip!(envelope.iter().copied(), slope_iter).map(|(env, slope)| {
         let w = carrier * (amplitude * env + drag_amp * slope);
-        y[0] += w.re;
-        if let Some(y1) = y.get_mut(1) {
-            *y1 += w.im;
-        }
         carrier *= dcarrier;
-    }
+        w
+    });
+    add_samples(waveform, samples);
 }
 
 fn mix_add_plateau(
-    mut waveform: ArrayViewMut2<f64>,
+    waveform: ArrayViewMut2<f64>,
     amplitude: Complex64,
     phase: Phase,
     dphase: Phase,
 ) {
     let mut carrier = phase.phaser() * amplitude;
     let dcarrier = dphase.phaser();
-    for mut y in waveform.columns_mut() {
-        y[0] += carrier.re;
-        if let Some(y1) = y.get_mut(1) {
-            *y1 += carrier.im;
-        }
+    let samples = iter::repeat_with(|| {
+        let w = carrier;
         carrier *= dcarrier;
+        w
+    });
+    add_samples(waveform, samples);
+}
+
+/// Add complex samples to the waveform row by row.
+///
+/// Rows of the waveform are contiguous while columns are not, so walking the
+/// I and Q rows side by side avoids creating a strided view per sample.
+fn add_samples(mut waveform: ArrayViewMut2<f64>, samples: impl IntoIterator<Item = Complex64>) {
+    let mut rows = waveform.outer_iter_mut();
+    let i_row = rows.next().expect("Waveform should have at least one row");
+    match rows.next() {
+        Some(q_row) => {
+            for ((i, q), w) in i_row.into_iter().zip(q_row).zip(samples) {
+                *i += w.re;
+                *q += w.im;
+            }
+        }
+        None => {
+            for (i, w) in i_row.into_iter().zip(samples) {
+                *i += w.re;
+            }
+        }
     }
 }
 
@@ -465,14 +485,16 @@ where
 pub(crate) fn apply_iq_inplace(waveform: &mut ArrayViewMut2<f64>, iq_matrix: ArrayView2<f64>) {
     assert!(matches!(waveform.shape(), [2, _]));
     assert!(matches!(iq_matrix.shape(), [2, 2]));
-    for mut col in waveform.columns_mut() {
-        let y = [
-            iq_matrix[(0, 0)] * col[0] + iq_matrix[(0, 1)] * col[1],
-            iq_matrix[(1, 0)] * col[0] + iq_matrix[(1, 1)] * col[1],
-        ];
-        col[0] = y[0];
-        col[1] = y[1];
-    }
+    let (m00, m01) = (iq_matrix[(0, 0)], iq_matrix[(0, 1)]);
+    let (m10, m11) = (iq_matrix[(1, 0)], iq_matrix[(1, 1)]);
+    // Walk the two contiguous rows in lockstep instead of strided columns so
+    // the loop can be vectorized.
+    let (mut i_row, mut q_row) = waveform.multi_slice_mut((s![0, ..], s![1, ..]));
+    azip!((i in &mut i_row, q in &mut q_row) {
+        let (x, y) = (*i, *q);
+        *i = m00 * x + m01 * y;
+        *q = m10 * x + m11 * y;
+    });
 }
 
 pub(crate) fn apply_offset_inplace(waveform: &mut ArrayViewMut2<f64>, offset: ArrayView1<f64>) {
@@ -487,3 +509,21 @@ pub(crate) fn apply_iir_inplace(waveform: &mut ArrayViewMut2<f64>, sos: ArrayVie
 pub(crate) fn apply_fir_inplace(waveform: &mut ArrayViewMut2<f64>, taps: ArrayView1<f64>) {
     self::fir::fir_filter_inplace(waveform.view_mut(), taps)
 }
+
+#[cfg(test)]
+mod tests {
+    use ndarray::array;
+
+    use super::*;
+
+    #[test]
+    fn test_apply_iq_inplace() {
+        let mut waveform = array![[1.0, 0.0, 2.0], [0.0, 1.0, 3.0]];
+        let iq_matrix = array![[1.0, 2.0], [3.0, 4.0]];
+        let expected = array![[1.0, 2.0, 8.0], [3.0, 4.0, 18.0]];
+
+        apply_iq_inplace(&mut waveform.view_mut(), iq_matrix.view());
+
+        assert_eq!(waveform, expected);
+    }
+}
@@ -11,35 +11,16 @@ impl<'a, 'b> WithSimd for ApplyFirInplace<'a, 'b> {
 
     #[inline(always)]
     fn with_simd<S: Simd>(mut self, simd: S) -> Self::Output {
-        let lanes = std::mem::size_of::<S::f64s>() / std::mem::size_of::<f64>();
-        let buffer_len = align_ceil(self.taps.len(), lanes);
-        assert!(buffer_len % lanes == 0);
-        let taps_buffer = {
-            let mut buffer = vec![0.0; buffer_len * 2];
-            for (&t, b) in self.taps.iter().zip(buffer[..buffer_len].iter_mut().rev()) {
-                *b = t;
-            }
-            for (&t, b) in self.taps.iter().zip(buffer[buffer_len..].iter_mut().rev()) {
-                *b = t;
-            }
-            buffer
-        };
+        let n = self.waveform.ncols();
+        let mut input = vec![0.0; n];
+        let mut output = vec![0.0; n];
         for mut row in self.waveform.axis_iter_mut(Axis(0)) {
-            let mut w_buffer = vec![0.0; buffer_len];
-            for (i, w) in row.iter_mut().enumerate() {
-                let w_buffer_index = i % buffer_len;
-                w_buffer[w_buffer_index] = *w;
-                let tap_buffer_index = buffer_len - w_buffer_index - 1;
-                let (taps_simd, _) = S::f64s_as_simd(&taps_buffer[tap_buffer_index..]);
-                let (w_simd, _) = S::f64s_as_simd(&w_buffer);
-                let sum = taps_simd
-                    .iter()
-                    .zip(w_simd.iter())
-                    .fold(simd.f64s_splat(0.0), |acc, (taps, w)| {
-                        simd.f64s_mul_add_e(*taps, *w, acc)
-                    });
-                let sum = simd.f64s_reduce_sum(sum);
-                *w = sum;
+            for (x, &w) in input.iter_mut().zip(row.iter()) {
+                *x = w;
+            }
+            shift_add(simd, &mut output, &input, self.taps);
+            for (w, &y) in row.iter_mut().zip(output.iter()) {
+                *w = y;
             }
         }
     }
@@ -50,22 +31,55 @@ pub(crate) fn fir_filter_inplace(waveform: ArrayViewMut2<f64>, taps: ArrayView1<
     arch.dispatch(ApplyFirInplace { waveform, taps });
 }
 
-#[inline]
-fn align_ceil(x: usize, n: usize) -> usize {
-    let r = x % n;
-    if r == 0 {
-        x
-    } else {
-        x + n - r
+/// Direct convolution as a sum of shifted and scaled copies of the input.
+///
+/// Each tap is one contiguous pass over the signal, which is much cheaper than
+/// a dot product per sample for the short filters used in practice.
+#[inline(always)]
+fn shift_add<S: Simd>(simd: S, output: &mut [f64], input: &[f64], taps: ArrayView1<f64>) {
+    output.fill(0.0);
+    for (k, &t) in taps.iter().enumerate().take(input.len()) {
+        let n = input.len() - k;
+        let (out_head, out_tail) = S::f64s_as_mut_simd(&mut output[k..]);
+        let (in_head, in_tail) = S::f64s_as_simd(&input[..n]);
+        let t_simd = simd.f64s_splat(t);
+        for (y, &x) in out_head.iter_mut().zip(in_head) {
+            *y = simd.f64s_mul_add_e(t_simd, x, *y);
+        }
+        for (y, &x) in out_tail.iter_mut().zip(in_tail) {
+            *y += t * x;
+        }
     }
 }
 
 #[cfg(test)]
 mod tests {
-    use ndarray::{array, stack, Array2};
+    use float_cmp::approx_eq;
+    use ndarray::{array, stack, Array1, Array2};
 
     use super::*;
 
+    fn test_signal(n: usize) -> Array2<f64> {
+        Array2::from_shape_fn((2, n), |(r, i)| ((r * n + i) as f64 * 0.37).sin())
+    }
+
+    fn naive_convolve(signal: &Array2<f64>, taps: &Array1<f64>) -> Array2<f64> {
+        Array2::from_shape_fn(signal.dim(), |(r, i)| {
+            taps.iter()
+                .take(i + 1)
+                .enumerate()
+                .map(|(k, &t)| t * signal[(r, i - k)])
+                .sum()
+        })
+    }
+
+    fn assert_close(actual: &Array2<f64>, expected: &Array2<f64>) {
+        assert_eq!(actual.dim(), expected.dim());
+        for (&a, &e) in actual.iter().zip(expected) {
+            assert!(approx_eq!(f64, a, e, epsilon = 1e-12), "{a} != {e}");
+        }
+    }
+
     #[test]
     fn test_fir_filter_inplace() {
         let mut signal = Array2::ones((2, 10));
@@ -79,4 +93,28 @@ mod tests {
 
         assert_eq!(signal, expected);
     }
+
+    #[test]
+    fn test_fir_filter_taps_longer_than_signal() {
+        let mut signal = test_signal(3);
+        let taps = array![1.0, 0.5, 0.25, 0.125, 0.0625, 0.03125, 0.015625];
+        let expected = naive_convolve(&signal, &taps);
+
+        fir_filter_inplace(signal.view_mut(), taps.view());
+
+        assert_close(&signal, &expected);
+    }
+
+    #[test]
+    fn test_fir_filter_unaligned_length() {
+        // 37 is not a multiple of any SIMD lane count, so every shifted pass
+        // has a scalar tail.
+        let mut signal = test_signal(37);
+        let taps = array![0.9, -0.3, 0.2, 0.05, -0.01];
+        let expected = naive_convolve(&signal, &taps);
+
+        fir_filter_inplace(signal.view_mut(), taps.view());
+
+        assert_close(&signal, &expected);
+    }
 }
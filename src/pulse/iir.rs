@@ -1,6 +1,6 @@
 use std::{
     array,
-    ops::{Add, Mul, Sub},
+    ops::{Add, Div, Mul, Sub},
 };
 
 use ndarray::{ArrayView1, ArrayView2, ArrayViewMut2};
@@ -10,6 +10,8 @@ use thiserror::Error;
 pub(crate) enum Error {
     #[error("Invalid SOS format")]
     InvalidSosFormat,
+    #[error("Leading denominator coefficient of a section is zero")]
+    ZeroLeadingDenominator,
 }
 
 type Result<T> = std::result::Result<T, Error>;
@@ -143,24 +145,36 @@ where
     }
 }
 
-impl<'a, T: Copy> TryFrom<ArrayView1<'a, T>> for BiquadCoefficients<T> {
+impl<'a, T> TryFrom<ArrayView1<'a, T>> for BiquadCoefficients<T>
+where
+    T: Div<Output = T> + PartialEq + Copy + Default,
+{
     type Error = Error;
 
+    /// Coefficients are normalized by `a0` here so that the filter loop never
+    /// divides.
     fn try_from(value: ArrayView1<'a, T>) -> Result<Self> {
         if value.dim() != 6 {
             return Err(Error::InvalidSosFormat);
         }
+        let a0 = value[3];
+        if a0 == T::default() {
+            return Err(Error::ZeroLeadingDenominator);
+        }
         Ok(Self {
-            b0: value[0],
-            b1: value[1],
-            b2: value[2],
-            a1: value[4],
-            a2: value[5],
+            b0: value[0] / a0,
+            b1: value[1] / a0,
+            b2: value[2] / a0,
+            a1: value[4] / a0,
+            a2: value[5] / a0,
         })
     }
 }
 
-impl<'a, T: Copy + Default> TryFrom<ArrayView1<'a, T>> for Biquad<T> {
+impl<'a, T> TryFrom<ArrayView1<'a, T>> for Biquad<T>
+where
+    T: Div<Output = T> + PartialEq + Copy + Default,
+{
     type Error = Error;
 
     fn try_from(value: ArrayView1<'a, T>) -> Result<Self> {
@@ -168,7 +182,10 @@ impl<'a, T: Copy + Default> TryFrom<ArrayView1<'a, T>> for Biquad<T> {
     }
 }
 
-impl<'a, T: Copy + Default> TryFrom<ArrayView2<'a, T>> for Iir<T> {
+impl<'a, T> TryFrom<ArrayView2<'a, T>> for Iir<T>
+where
+    T: Div<Output = T> + PartialEq + Copy + Default,
+{
     type Error = Error;
 
     fn try_from(value: ArrayView2<'a, T>) -> Result<Self> {
@@ -182,7 +199,7 @@ impl<'a, T: Copy + Default> TryFrom<ArrayView2<'a, T>> for Iir<T> {
 
 impl<'a, T, const N: usize> TryFrom<ArrayView2<'a, T>> for IirPipeline<T, N>
 where
-    T: Copy + Default,
+    T: Div<Output = T> + PartialEq + Copy + Default,
     [T; N]: Default,
 {
     type Error = Error;
@@ -191,14 +208,15 @@ where
         if value.dim().0 != N {
             panic!("N should be equal to the number of biquads in the pipeline");
         }
-        if value.dim().1 != 6 {
-            return Err(Error::InvalidSosFormat);
-        }
-        let b0 = array::from_fn(|i| value[(i, 0)]);
-        let b1 = array::from_fn(|i| value[(i, 1)]);
-        let b2 = array::from_fn(|i| value[(i, 2)]);
-        let a1 = array::from_fn(|i| value[(i, 4)]);
-        let a2 = array::from_fn(|i| value[(i, 5)]);
+        let sections = value
+            .outer_iter()
+            .map(BiquadCoefficients::try_from)
+            .collect::<Result<Vec<_>>>()?;
+        let b0 = array::from_fn(|i| sections[i].b0);
+        let b1 = array::from_fn(|i| sections[i].b1);
+        let b2 = array::from_fn(|i| sections[i].b2);
+        let a1 = array::from_fn(|i| sections[i].a1);
+        let a2 = array::from_fn(|i| sections[i].a2);
         Ok(Self {
             b0,
             b1,
@@ -214,7 +232,13 @@ where
 
 pub(crate) fn iir_filter_inplace<T>(signal: ArrayViewMut2<T>, sos: ArrayView2<T>) -> Result<()>
 where
-    T: Add<Output = T> + Mul<Output = T> + Sub<Output = T> + Copy + Default,
+    T: Add<Output = T>
+        + Mul<Output = T>
+        + Sub<Output = T>
+        + Div<Output = T>
+        + PartialEq
+        + Copy
+        + Default,
 {
     match sos.dim().0 {
         0 => Ok(()),
@@ -231,7 +255,13 @@ fn specialized_filter<T, const N: usize>(
     sos: ArrayView2<T>,
 ) -> Result<()>
 where
-    T: Add<Output = T> + Mul<Output = T> + Sub<Output = T> + Copy + Default,
+    T: Add<Output = T>
+        + Mul<Output = T>
+        + Sub<Output = T>
+        + Div<Output = T>
+        + PartialEq
+        + Copy
+        + Default,
     [T; N]: Default,
 {
     let mut iir: IirPipeline<T, N> = sos.try_into()?;
@@ -245,7 +275,13 @@ where
 
 fn fallback_filter<T>(mut signal: ArrayViewMut2<T>, sos: ArrayView2<T>) -> Result<()>
 where
-    T: Add<Output = T> + Mul<Output = T> + Sub<Output = T> + Copy + Default,
+    T: Add<Output = T>
+        + Mul<Output = T>
+        + Sub<Output = T>
+        + Div<Output = T>
+        + PartialEq
+        + Copy
+        + Default,
 {
     let mut iir: Iir<T> = sos.try_into()?;
     for mut row in signal.outer_iter_mut() {
@@ -308,6 +344,24 @@ mod tests {
         assert_eq!(signal, expected);
     }
 
+    #[test]
+    fn test_unnormalized_sos() {
+        let (mut signal, sos, expected) = get_test_case();
+        let sos = sos * 2.0;
+        specialized_filter::<_, 2>(signal.view_mut(), sos.view()).unwrap();
+        assert_eq!(signal, expected);
+    }
+
+    #[test]
+    fn test_zero_leading_denominator() {
+        let (mut signal, mut sos, _) = get_test_case();
+        sos[(1, 3)] = 0.0;
+        assert!(matches!(
+            specialized_filter::<_, 2>(signal.view_mut(), sos.view()),
+            Err(Error::ZeroLeadingDenominator)
+        ));
+    }
+
     #[test]
     fn test_fallback_filter() {
         let (mut signal, sos, expected) = get_test_case();
@@ -1,11 +1,29 @@
 import numpy as np
+import pytest
 
 import bosing
 
 
-def test_basic():
+def _sosfilt(sos, x):
+    y = np.array(x, dtype=np.float64)
+    for b0, b1, b2, a0, a1, a2 in sos:
+        b0, b1, b2, a1, a2 = b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0
+        s1 = s2 = 0.0
+        for i, xi in enumerate(y):
+            yi = b0 * xi + s1
+            s1 = b1 * xi - a1 * yi + s2
+            s2 = b2 * xi - a2 * yi
+            y[i] = yi
+    return y
+
+
+@pytest.fixture(scope="module")
+def shapes():
+    return {"hann": bosing.Hann()}
+
+
+def test_basic(shapes):
     channels = {"xy0": bosing.Channel(100e6, 2e9, 100000)}
-    shapes = {"hann": bosing.Hann()}
     schedule = bosing.Stack(duration=49.9e-6).with_children(bosing.Play("xy0", "hann", 0.1, 100e-9))
     result = bosing.generate_waveforms(channels, shapes, schedule)
     assert "xy0" in result
@@ -14,11 +32,10 @@ def test_basic():
     w = w[0] + 1j * w[1]
     assert w[0] == 0
     assert w[-1] == 0
-    assert np.any(w != 0)
+    assert np.any(w)
 
 
-def test_mixing():
-    shapes = {"hann": bosing.Hann()}
+def test_mixing(shapes):
     schedule = bosing.Stack(duration=500e-9).with_children(
         bosing.Play(
             channel_id="xy",
@@ -40,6 +57,145 @@ def test_mixing():
     result = bosing.generate_waveforms(channels, shapes, schedule)
     w2 = result["xy"]
     w2 = w2[0] + 1j * w2[1]
-    w2 = w2 * np.exp(1j * (2 * np.pi * freq * np.arange(1000) / 2e9))
+    w2 *= np.exp((2j * np.pi * freq / 2e9) * np.arange(1000))
+
+    assert np.allclose(w1, w2)
+
+
+def test_real_channel(shapes):
+    schedule = bosing.Stack(duration=500e-9).with_children(
+        bosing.Play("xy", "hann", 0.3, 100e-9, plateau=200e-9, drag_coef=5e-10),
+        bosing.Play("xy", None, 0.2, 50e-9),
+        bosing.Barrier(duration=10e-9),
+    )
+    freq = 30e6
+
+    channels = {"xy": bosing.Channel(freq, 2e9, 1000, is_real=True)}
+    w_real = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+    channels = {"xy": bosing.Channel(freq, 2e9, 1000)}
+    w_complex = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+
+    assert w_real.shape == (1, 1000)
+    assert np.any(w_real)
+    assert np.allclose(w_real[0], w_complex[0])
+
+
+@pytest.mark.parametrize("filter_offset", [False, True])
+def test_post_process(shapes, filter_offset):
+    schedule = bosing.Stack(duration=500e-9).with_children(
+        bosing.Play("xy", "hann", 0.3, 100e-9, plateau=200e-9, drag_coef=5e-10),
+        bosing.Barrier(duration=10e-9),
+    )
+    freq = 30e6
+    iq_matrix = np.array([[1.0, 0.1], [-0.2, 0.9]])
+    offset = np.array([0.1, -0.05])
+    iir = np.array([[0.5, 0.0, 0.0, 1.0, -0.5, 0.0], [1.0, 0.2, 0.0, 1.0, 0.1, 0.05]])
+    fir = np.array([1.0, 0.1, 0.01, 0.001])
+
+    channels = {
+        "xy": bosing.Channel(
+            freq,
+            2e9,
+            1000,
+            iq_matrix=iq_matrix,
+            offset=offset,
+            iir=iir,
+            fir=fir,
+            filter_offset=filter_offset,
+        )
+    }
+    w1 = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+
+    channels = {"xy": bosing.Channel(freq, 2e9, 1000)}
+    w2 = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+    w2 = iq_matrix @ w2
+    if filter_offset:
+        w2 += offset[:, np.newaxis]
+    w2 = np.array([np.convolve(_sosfilt(iir, row), fir)[: row.size] for row in w2])
+    if not filter_offset:
+        w2 += offset[:, np.newaxis]
 
     assert np.allclose(w1, w2)
+
+
+def test_iir_zero_a0():
+    iir = [[1.0, 0.0, 0.0, 1.0, 0.5, 0.0], [1.0, 0.0, 0.0, 0.0, 0.5, 0.0]]
+    with pytest.raises(ValueError, match="a0"):
+        bosing.Channel(0, 2e9, 1000, iir=iir)
+
+
+def test_iir_normalization(shapes):
+    schedule = bosing.Stack(duration=500e-9).with_children(
+        bosing.Play("xy", "hann", 0.3, 100e-9, plateau=200e-9),
+        bosing.Barrier(duration=10e-9),
+    )
+    iir = np.array([[0.5, 0.0, 0.0, 1.0, -0.5, 0.0], [1.0, 0.2, 0.0, 1.0, 0.1, 0.05]])
+    scale = np.array([[2.0], [-3.0]])
+
+    channels = {"xy": bosing.Channel(30e6, 2e9, 1000, iir=iir)}
+    w1 = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+    channels = {"xy": bosing.Channel(30e6, 2e9, 1000, iir=iir * scale)}
+    w2 = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+
+    assert np.any(w1)
+    assert np.allclose(w1, w2)
+
+
+def test_interp_nan():
+    with pytest.raises(RuntimeError):
+        bosing.Interp([-0.5, -0.5, np.nan, 0.5, 0.5], [0.0, 1.0, 0.0], 1)
+
+
+def test_interp_reuse():
+    shapes = {"tri": bosing.Interp([-0.5, -0.5, 0.0, 0.5, 0.5], [0.0, 1.0, 0.0], 1)}
+    schedule = bosing.Stack(duration=500e-9).with_children(
+        bosing.Play("xy", "tri", 0.3, 100e-9, plateau=200e-9),
+        bosing.Barrier(duration=10e-9),
+    )
+    channels = {"xy": bosing.Channel(30e6, 2e9, 1000)}
+
+    w1 = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+    w2 = bosing.generate_waveforms(channels, shapes, schedule)["xy"]
+
+    assert np.any(w1)
+    assert np.array_equal(w1, w2)
+
+
+def test_convert():
+    assert bosing.Alignment.convert("center") == bosing.Alignment.Center
+    assert bosing.Direction.convert("forward") == bosing.Direction.Forward
+
+    length = bosing.GridLength.convert(1e-7)
+    assert (length.value, length.unit) == (1e-7, bosing.GridLengthUnit.Seconds)
+    length = bosing.GridLength.convert("auto")
+    assert length.unit == bosing.GridLengthUnit.Auto
+    length = bosing.GridLength.convert("*")
+    assert (length.value, length.unit) == (1.0, bosing.GridLengthUnit.Star)
+    length = bosing.GridLength.convert("2*")
+    assert (length.value, length.unit) == (2.0, bosing.GridLengthUnit.Star)
+
+
+@pytest.mark.parametrize(
+    ("converter", "value"),
+    [
+        (bosing.Alignment.convert, "middle"),
+        (bosing.Direction.convert, "upward"),
+        (bosing.GridLength.convert, "x*"),
+    ],
+)
+def test_convert_invalid(converter, value):
+    with pytest.raises(ValueError):
+        converter(value)
+
+
+def test_element_string_arguments():
+    stack = bosing.Stack(direction="forward", alignment="center")
+    assert stack.direction == bosing.Direction.Forward
+    assert stack.alignment == bosing.Alignment.Center
+
+    grid = bosing.Grid(columns=["auto", "*", 1e-7])
+    assert [c.unit for c in grid.columns] == [
+        bosing.GridLengthUnit.Auto,
+        bosing.GridLengthUnit.Star,
+        bosing.GridLengthUnit.Seconds,
+    ]